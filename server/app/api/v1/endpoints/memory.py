@@ -1,5 +1,7 @@
 from uuid import UUID
 from datetime import datetime, timezone
+from typing import List
+import asyncio
 import time
 import logging
 
@@ -7,6 +9,8 @@ from fastapi import APIRouter, HTTPException, Depends, status
 
 from app.schemas.memory import (
     MemoryCreateRequest,
+    MemoryBulkCreateRequest,
+    MemoryBulkCreateResponse,
     MemorySearchRequest,
     MemorySearchResponse,
     MemoryResponse,
@@ -29,79 +33,137 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Embedding pipelines a bulk create runs at once, to stay under TwelveLabs
+# rate limits
+BULK_EMBED_CONCURRENCY = 4
+
 # Initialize Supabase manager
 supabase_manager = SupabaseManager()
 
 # User ID now comes from authentication
 
 
+async def _build_memory_point(content: str, user_id: str) -> MemoryPoint:
+    """Embed a video file path or URL and wrap it in a memory point"""
+    # Process video file/URL to get embedding
+    if content.startswith(("http://", "https://")):
+        # Process video URL
+        embedding_result = await embedding_service.process_video_embedding_pipeline(
+            video_url=content
+        )
+    else:
+        # Assume content is a file path
+        embedding_result = await embedding_service.process_video_embedding_pipeline(
+            file_path=content
+        )
+
+    if not embedding_result:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate video embedding",
+        )
+
+    # Extract the video embedding from the result
+    embedding = embedding_result.get("video_embedding")
+    if not embedding:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="No video embedding found in result",
+        )
+
+    # Create memory point
+    return MemoryPoint(
+        user_id=UUID(user_id),
+        content=content,  # This will be the video file path or URL
+        content_type="video",  # Always video since we only store videos
+        timestamp=datetime.now(timezone.utc),
+        metadata={},  # Not stored in vector payload
+        tags=[],  # Not stored in vector payload
+        source_id=None,  # Not stored in vector payload
+        embedding=embedding,
+    )
+
+
+def _memory_response(memory: MemoryPoint) -> MemoryResponse:
+    """Convert a stored memory point to its API response"""
+    return MemoryResponse(
+        id=memory.id,
+        content=memory.content,
+        content_type=memory.content_type,
+        timestamp=memory.timestamp,
+        metadata=memory.metadata,
+        tags=memory.tags,
+        source_id=memory.source_id,
+    )
+
+
 @router.post("/create", response_model=MemoryResponse)
 async def create_memory(
     request: MemoryCreateRequest, current_user: User = Depends(get_current_user)
 ):
     """Create a new memory with vector embedding"""
     try:
-        # Process video file/URL to get embedding
-        if request.content.startswith(("http://", "https://")):
-            # Process video URL
-            embedding_result = await embedding_service.process_video_embedding_pipeline(
-                video_url=request.content
-            )
-        else:
-            # Assume content is a file path
-            embedding_result = await embedding_service.process_video_embedding_pipeline(
-                file_path=request.content
-            )
+        memory = await _build_memory_point(request.content, current_user.id)
 
-        if not embedding_result:
+        # Store in vector database
+        success = await vector_store.add_memory(memory)
+        if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate video embedding",
+                detail="Failed to store memory",
             )
 
-        # Extract the video embedding from the result
-        embedding = embedding_result.get("video_embedding")
-        if not embedding:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="No video embedding found in result",
-            )
+        # Return response
+        return _memory_response(memory)
 
-        # Create memory point
-        memory = MemoryPoint(
-            user_id=UUID(current_user.id),
-            content=request.content,  # This will be the video file path or URL
-            content_type="video",  # Always video since we only store videos
-            timestamp=datetime.now(timezone.utc),
-            metadata={},  # Not stored in vector payload
-            tags=[],  # Not stored in vector payload
-            source_id=None,  # Not stored in vector payload
-            embedding=embedding,
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating memory: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error",
         )
 
-        # Store in vector database
-        success = await vector_store.add_memory(memory)
+
+@router.post("/create_bulk", response_model=MemoryBulkCreateResponse)
+async def create_memories_bulk(
+    request: MemoryBulkCreateRequest, current_user: User = Depends(get_current_user)
+):
+    """Create several memories, embedding concurrently and upserting once"""
+    try:
+        semaphore = asyncio.Semaphore(BULK_EMBED_CONCURRENCY)
+
+        async def build(content: str) -> MemoryPoint:
+            async with semaphore:
+                return await _build_memory_point(content, current_user.id)
+
+        # A TaskGroup cancels the remaining embeddings as soon as one fails
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(build(item.content)) for item in request.items]
+        except ExceptionGroup as eg:
+            # Surface the first failure (e.g. its HTTPException) unwrapped
+            raise eg.exceptions[0]
+        memories: List[MemoryPoint] = [task.result() for task in tasks]
+
+        # Store all points in a single vector database upsert
+        success = await vector_store.add_memories(memories)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to store memory",
+                detail="Failed to store memories",
             )
 
-        # Return response
-        return MemoryResponse(
-            id=memory.id,
-            content=memory.content,
-            content_type=memory.content_type,
-            timestamp=memory.timestamp,
-            metadata=memory.metadata,
-            tags=memory.tags,
-            source_id=memory.source_id,
+        return MemoryBulkCreateResponse(
+            ids=[memory.id for memory in memories],
+            memories=[_memory_response(memory) for memory in memories],
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error creating memory: {e}")
+        logger.error(f"Error creating memories in bulk: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
@@ -114,7 +176,7 @@ async def search_memories(
 ):
     """Search memories using semantic similarity"""
     try:
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
 
         # Generate embedding for search query using text embedding service
         query_embedding = await text_embedding_service.get_embedding(request.query)
@@ -175,7 +237,7 @@ async def search_memories(
 
             enriched_results.append(enriched_result)
 
-        search_time = (time.time() - start_time) * 1000
+        search_time = (time.monotonic_ns() - start_ns) / 1e6
 
         return MemorySearchResponse(
             results=enriched_results,
@@ -200,7 +262,7 @@ async def chatbot_query(
 ):
     """Chatbot endpoint that refines user input and finds the best matching video"""
     try:
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
 
         # Step 1: Refine the user input using OpenAI
         refined_query = openai_service.refine_query(request.user_input)
@@ -224,7 +286,7 @@ async def chatbot_query(
             score_threshold=request.confidence_threshold or 0.01,
         )
 
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.monotonic_ns() - start_ns) / 1e6
 
         # Step 4: Collect context from all relevant videos
         if results and len(results) > 0:
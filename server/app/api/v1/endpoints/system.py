@@ -63,7 +63,7 @@ async def start_video_system(
                 _running_systems[user_id] = {
                     "manager": manager,
                     "status": "running",
-                    "started_at": asyncio.get_event_loop().time(),
+                    "started_at": asyncio.get_running_loop().time(),
                 }
                 await manager.start_both_systems()
             except Exception as e:
@@ -110,7 +110,7 @@ async def get_system_status(current_user: User = Depends(get_current_user)):
             )
 
         system_info = _running_systems[user_id]
-        current_time = asyncio.get_event_loop().time()
+        current_time = asyncio.get_running_loop().time()
         uptime = current_time - system_info["started_at"]
 
         return JSONResponse(
@@ -187,7 +187,7 @@ async def end_video_system(current_user: User = Depends(get_current_user)):
                 "status": "ended",
                 "message": "Video system ended successfully",
                 "uptime_seconds": round(
-                    asyncio.get_event_loop().time() - system_info["started_at"], 2
+                    asyncio.get_running_loop().time() - system_info["started_at"], 2
                 )
                 if system_info
                 else 0,
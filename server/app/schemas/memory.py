@@ -16,6 +16,14 @@ class MemoryCreateRequest(BaseModel):
     source_id: Optional[str] = None
 
 
+class MemoryBulkCreateRequest(BaseModel):
+    """Request schema for creating several memories at once"""
+
+    items: List[MemoryCreateRequest] = Field(
+        ..., min_length=1, max_length=100, description="Memories to create"
+    )
+
+
 class MemorySearchRequest(BaseModel):
     """Request schema for memory search"""
 
@@ -84,6 +92,13 @@ class MemoryResponse(BaseModel):
         json_encoders = {datetime: lambda v: v.isoformat(), UUID: lambda v: str(v)}
 
 
+class MemoryBulkCreateResponse(BaseModel):
+    """Response schema for bulk memory creation"""
+
+    ids: List[UUID]
+    memories: List[MemoryResponse]
+
+
 class MemoryDeleteRequest(BaseModel):
     """Request schema for deleting memories"""
 
@@ -96,9 +96,9 @@ class EmbeddingService:
                 f"   ⏰ Waiting for task completion (checking every {sleep_interval}s, max {max_wait_time}s)..."
             )
 
-            start_time = time.time()
+            start_time = time.monotonic()
 
-            while time.time() - start_time < max_wait_time:
+            while time.monotonic() - start_time < max_wait_time:
                 # Check task status asynchronously
                 status_result = self.client.embed.task.status(task.id)
 
@@ -76,6 +76,20 @@ class VectorStoreService:
             logger.error(f"Failed to initialize collection: {e}")
             return False
 
+    @staticmethod
+    def _memory_point(memory: MemoryPoint) -> PointStruct:
+        """Build the Qdrant point stored for a memory"""
+        return PointStruct(
+            id=str(memory.id),
+            vector=memory.embedding,
+            payload={
+                "user_id": str(memory.user_id),
+                # The memory UUID links the point to its postgres row
+                "video_id": str(memory.id),
+                "timestamp": memory.timestamp.isoformat(),
+            },
+        )
+
     async def add_memory(self, memory: MemoryPoint) -> bool:
         """Add a single memory to the vector store"""
         try:
@@ -83,20 +97,11 @@ class VectorStoreService:
                 logger.error("Memory must have an embedding to be stored")
                 return False
 
-            point = PointStruct(
-                id=str(memory.id),
-                vector=memory.embedding,
-                payload={
-                    "user_id": str(memory.user_id),
-                    "video_id": str(
-                        memory.id
-                    ),  # This will be the UUID to connect to postgres
-                    "timestamp": memory.timestamp.isoformat(),
-                },
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[self._memory_point(memory)],
             )
 
-            self.client.upsert(collection_name=self.collection_name, points=[point])
-
             logger.info(f"Memory {memory.id} added successfully")
             return True
 
@@ -104,6 +109,24 @@ class VectorStoreService:
             logger.error(f"Failed to add memory {memory.id}: {e}")
             return False
 
+    async def add_memories(self, memories: List[MemoryPoint]) -> bool:
+        """Add several memories to the vector store in a single upsert"""
+        try:
+            if any(not memory.embedding for memory in memories):
+                logger.error("Memory must have an embedding to be stored")
+                return False
+
+            points = [self._memory_point(memory) for memory in memories]
+
+            self.client.upsert(collection_name=self.collection_name, points=points)
+
+            logger.info(f"{len(points)} memories added successfully")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to add {len(memories)} memories: {e}")
+            return False
+
     async def search_memories(
         self,
         user_id: UUID,
@@ -115,7 +138,7 @@ class VectorStoreService:
     ) -> List[MemorySearchResult]:
         """Search memories using vector similarity"""
         try:
-            start_time = time.time()
+            start_ns = time.monotonic_ns()
 
             # Build filter conditions
             filter_conditions = [
@@ -165,7 +188,7 @@ class VectorStoreService:
                     logger.error(f"Error parsing search result: {e}")
                     continue
 
-            search_time = (time.time() - start_time) * 1000
+            search_time = (time.monotonic_ns() - start_ns) / 1e6
             logger.info(
                 f"Search completed in {search_time:.2f}ms, found {len(results)} results"
             )
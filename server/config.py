@@ -15,11 +15,21 @@ class Config:
     # Video settings
     FPS = 10  # 10 FPS for faster processing while maintaining summary quality
     RESOLUTION = (1280, 720)  # 720p (width, height)
+    # Largest size segments are encoded at; larger camera frames are scaled
+    # down (aspect kept) in the encoder, since analysis doesn't need more
+    INGEST_RESOLUTION = (1280, 720)
     SEGMENT_DURATION = 10  # seconds
 
     # Performance optimizations
-    TWELVELABS_POLLING_INTERVAL = 1.0  # Reduced from 2s to 1s for faster uploads
+    TWELVELABS_POLLING_INTERVAL = 0.2  # Initial poll interval, backs off exponentially
+    TWELVELABS_MAX_POLLING_INTERVAL = 2.0  # Cap for the backoff between polls
     WORKER_TIMEOUT = 2  # Reduced queue timeout for better responsiveness
+    # Reuse TwelveLabs results for byte-identical segments (opt-in, for re-runs)
+    ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "").lower() in (
+        "1",
+        "true",
+    )
+    ANALYSIS_CACHE_SIZE = 256  # Entries kept per cache, least recently used evicted
 
     # Camera settings (Mac FaceTime HD)
     CAMERA_INDEX = os.getenv("CAMERA_INDEX")
@@ -36,6 +46,7 @@ class Config:
     REDIS_PORT = 6379
     REDIS_DB = 0
     REDIS_QUEUE_NAME = "video_processing_queue"
+    SEGMENT_ENQUEUE_BATCH_SIZE = 8  # Max finished segments per Redis round trip
 
     # Worker settings
     NUM_WORKERS = 3
@@ -52,6 +63,11 @@ def set_resolution(width, height):
     Config.RESOLUTION = (width, height)
 
 
+def set_ingest_resolution(width, height):
+    """Set the maximum resolution segments are encoded at"""
+    Config.INGEST_RESOLUTION = (width, height)
+
+
 def set_fps(fps):
     """Set frames per second"""
     Config.FPS = fps
@@ -15,7 +15,12 @@ from config import Config
 class VideoLifecycleManager:
     """Manages the complete video ingestion and processing lifecycle with Redis queues"""
 
-    def __init__(self, api_key: str, user_id: str = None):
+    def __init__(
+        self,
+        api_key: str,
+        user_id: str = None,
+        queue_manager: VideoQueueManager = None,
+    ):
         self.api_key = api_key
         self.user_id = user_id
         self.ingestion_system = VideoIngestionSystem(
@@ -28,7 +33,8 @@ class VideoLifecycleManager:
             api_key=api_key,
             num_workers=Config.NUM_WORKERS,
         )
-        self.queue_manager = VideoQueueManager()
+        # Reuse an already-connected queue manager when the caller has one
+        self.queue_manager = queue_manager or VideoQueueManager()
 
     async def start_ingestion_only(self):
         """Start only the video ingestion system"""
@@ -85,7 +91,8 @@ class VideoLifecycleManager:
         print("📊 Queue Monitoring")
         print("==================")
 
-        await self.queue_manager.connect()
+        if not self.queue_manager.redis:
+            await self.queue_manager.connect()
 
         try:
             while True:
@@ -132,13 +139,10 @@ def print_usage():
     print("  3. Or start both: python main.py")
 
 
-async def check_redis_connection():
-    """Check if Redis is available"""
+async def check_redis_connection(queue_manager: VideoQueueManager):
+    """Check if Redis is available, leaving queue_manager connected on success"""
     try:
-        queue_manager = VideoQueueManager()
-        connected = await queue_manager.connect()
-        await queue_manager.disconnect()
-        return connected
+        return await queue_manager.connect()
     except Exception as e:
         print(f"❌ Redis connection failed: {e}")
         print("Please ensure Redis is running on localhost:6379")
@@ -162,11 +166,16 @@ async def main():
         return
 
     # Check Redis connection for modes that need it
+    queue_manager = VideoQueueManager()
     if mode in ["ingestion", "workers", "default", "monitor"]:
-        if not await check_redis_connection():
+        if not await check_redis_connection(queue_manager):
             print("❌ Redis is required for this mode. Please start Redis server.")
             sys.exit(1)
 
+        # Only the monitor reuses this connection; other modes open their own
+        if mode != "monitor":
+            await queue_manager.disconnect()
+
     # Check for API key for modes that need it
     api_key = os.getenv("TWELVELABS_API_KEY") or Config.TWELVELABS_API_KEY
     if not api_key and mode in ["workers", "default"]:
@@ -182,7 +191,7 @@ async def main():
 
     # Create lifecycle manager with hardcoded user_id for testing
     user_id = "3561affa-b551-483c-be4d-a35c7b57a3fb"
-    manager = VideoLifecycleManager(api_key, user_id)
+    manager = VideoLifecycleManager(api_key, user_id, queue_manager=queue_manager)
 
     try:
         if mode == "ingestion":
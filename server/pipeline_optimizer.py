@@ -5,6 +5,8 @@ Validates that video segments are processed at consistent 10-second intervals
 """
 
 import asyncio
+import io
+import sys
 import time
 from datetime import datetime
 from video_queue.queue_manager import VideoQueueManager
@@ -15,7 +17,10 @@ class PipelineOptimizer:
 
     def __init__(self):
         self.queue_manager = VideoQueueManager()
-        self.timing_data = []
+        self._reset_samples()
+        self._sleep = 1.0  # Adaptive delay between checks
+        self._last_queue_size = None
+        self._min_check_interval = 1.0  # Queue events can't trigger checks faster
 
     async def start_validation(self, duration_minutes: int = 5):
         """Start timing validation for specified duration"""
@@ -24,26 +29,98 @@ class PipelineOptimizer:
         )
         await self.queue_manager.connect()
 
-        start_time = time.time()
-        end_time = start_time + (duration_minutes * 60)
-
-        while time.time() < end_time:
-            # Monitor queue and timing consistency
-            await self._check_timing_consistency()
-            await asyncio.sleep(10)  # Check every 10 seconds
+        self._reset_samples()
+
+        # Monotonic clock: immune to NTP/wall-clock adjustments mid-run
+        start_ns = time.monotonic_ns()
+        end_ns = start_ns + duration_minutes * 60 * 1_000_000_000
+
+        # Wake early on queue pushes/pops instead of relying on the timer alone
+        pubsub = await self.queue_manager.subscribe_queue_events()
+
+        try:
+            while (remaining := (end_ns - time.monotonic_ns()) / 1e9) > 0:
+                # Monitor queue and timing consistency
+                checked_ns = time.monotonic_ns()
+                queue_size = await self._check_timing_consistency()
+                self._adapt_sleep(queue_size, remaining)
+                await self._wait_for_queue_event(pubsub, min(self._sleep, remaining))
+
+                # A busy queue fires an event per push/pop; debounce them so
+                # checks stay at least _min_check_interval apart
+                wait = (
+                    self._min_check_interval - (time.monotonic_ns() - checked_ns) / 1e9
+                )
+                if wait > 0:
+                    await asyncio.sleep(min(wait, remaining))
+        finally:
+            if pubsub:
+                await pubsub.aclose()
 
         # Generate final report
         await self._generate_optimization_report()
 
+    def _reset_samples(self):
+        """Clear the running queue statistics"""
+        # Running totals over the whole run, all the report needs
+        self._sample_count = 0
+        self._queue_size_sum = 0
+        self._queue_size_max = 0
+
+    def _record_sample(self, queue_size: int):
+        """Fold a queue size sample into the running totals"""
+        self._sample_count += 1
+        self._queue_size_sum += queue_size
+        if queue_size > self._queue_size_max:
+            self._queue_size_max = queue_size
+
+    def _adapt_sleep(self, queue_size: int, remaining: float):
+        """Back off while the queue is steady, reset when it changes"""
+        if queue_size == self._last_queue_size:
+            self._sleep = min(self._sleep * 2, 60.0, max(remaining, 1.0))
+        else:
+            self._sleep = 1.0
+        self._last_queue_size = queue_size
+
+    async def _wait_for_queue_event(self, pubsub, timeout: float):
+        """Sleep up to timeout, returning early if the queue key changes"""
+        if not pubsub:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            # Events that arrived before the last check are already covered
+            await self._drain_queue_events(pubsub)
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=timeout
+            )
+            if message:
+                # One check covers the whole burst, not just this event
+                await self._drain_queue_events(pubsub)
+        except Exception as e:
+            print(f"Error waiting for queue events: {e}")
+            await asyncio.sleep(timeout)
+            return
+        if message:
+            self._sleep = 1.0
+
+    @staticmethod
+    async def _drain_queue_events(pubsub, limit: int = 1000):
+        """Discard queue events already pending, without waiting for more"""
+        for _ in range(limit):
+            if not await pubsub.get_message(ignore_subscribe_messages=True, timeout=0):
+                return
+
     async def _check_timing_consistency(self):
         """Check if segments are being processed at consistent intervals"""
-        queue_size = await self.queue_manager.get_queue_size()
-        timestamp = datetime.now()
+        # Size and server timestamp come from one atomic script call
+        queue_size, server_time = await self.queue_manager.get_queue_snapshot()
+        timestamp = datetime.fromtimestamp(server_time)
 
-        self.timing_data.append({"timestamp": timestamp, "queue_size": queue_size})
+        self._record_sample(queue_size)
 
         # Print queue size info (performance_monitor removed)
         print(f"Queue size at {timestamp.strftime('%H:%M:%S')}: {queue_size}")
+        return queue_size
 
     async def _diagnose_bottlenecks(self):
         """Diagnose pipeline bottlenecks (stub, performance_monitor removed)"""
@@ -51,46 +128,56 @@ class PipelineOptimizer:
 
     async def _generate_optimization_report(self):
         """Generate comprehensive optimization report (performance_monitor removed)"""
-        print("\n" + "=" * 60)
-        print("📊 PIPELINE OPTIMIZATION REPORT")
-        print("=" * 60)
+        # Build the whole report in memory and emit it with a single write
+        buf = io.StringIO()
+        print("\n" + "=" * 60, file=buf)
+        print("📊 PIPELINE OPTIMIZATION REPORT", file=buf)
+        print("=" * 60, file=buf)
 
         # Timing consistency (performance_monitor removed)
-        print("⏱️  TIMING ANALYSIS:")
-        print("   Expected interval: 10.00s")
+        print("⏱️  TIMING ANALYSIS:", file=buf)
+        print("   Expected interval: 10.00s", file=buf)
         print(
-            "   (Detailed timing analysis unavailable - performance monitoring disabled)"
+            "   (Detailed timing analysis unavailable - performance monitoring disabled)",
+            file=buf,
         )
 
         # Queue analysis
-        queue_sizes = [d["queue_size"] for d in self.timing_data]
-        if queue_sizes:
-            avg_queue = sum(queue_sizes) / len(queue_sizes)
-            max_queue = max(queue_sizes)
-            print("\n📊 QUEUE ANALYSIS:")
-            print(f"   Average queue size: {avg_queue:.1f}")
-            print(f"   Maximum queue size: {max_queue}")
+        if self._sample_count:
+            avg_queue = self._queue_size_sum / self._sample_count
+            max_queue = self._queue_size_max
+            print("\n📊 QUEUE ANALYSIS:", file=buf)
+            print(f"   Average queue size: {avg_queue:.1f}", file=buf)
+            print(f"   Maximum queue size: {max_queue}", file=buf)
 
             if avg_queue > 5:
-                print("   ⚠️  High average queue size indicates processing bottleneck")
+                print(
+                    "   ⚠️  High average queue size indicates processing bottleneck",
+                    file=buf,
+                )
             if max_queue > 20:
-                print("   ❌ Very high peak queue size - consider increasing workers")
+                print(
+                    "   ❌ Very high peak queue size - consider increasing workers",
+                    file=buf,
+                )
 
         # Recommendations
-        print("\n💡 OPTIMIZATION RECOMMENDATIONS:")
-        await self._generate_recommendations()
+        print("\n💡 OPTIMIZATION RECOMMENDATIONS:", file=buf)
+        await self._generate_recommendations(buf)
 
-        print("=" * 60)
+        print("=" * 60, file=buf)
 
-    async def _generate_recommendations(self):
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+    async def _generate_recommendations(self, out=None):
         """Generate specific optimization recommendations (performance_monitor removed)"""
-        queue_sizes = [d["queue_size"] for d in self.timing_data]
         recommendations = []
 
-        if queue_sizes and max(queue_sizes) > 20:
+        if self._sample_count and self._queue_size_max > 20:
             recommendations.append("Increase number of workers from 3 to 5")
             recommendations.append("Implement queue priority handling")
-        elif queue_sizes and sum(queue_sizes) / len(queue_sizes) > 5:
+        elif self._sample_count and self._queue_size_sum / self._sample_count > 5:
             recommendations.append(
                 "Monitor for queue backlog and optimize processing speed"
             )
@@ -102,7 +189,7 @@ class PipelineOptimizer:
             ]
 
         for i, rec in enumerate(recommendations, 1):
-            print(f"   {i}. {rec}")
+            print(f"   {i}. {rec}", file=out or sys.stdout)
 
 
 async def main():
@@ -122,4 +209,16 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop is optional; fall back to the default event loop without it
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
+    with asyncio.Runner() as runner:
+        # Eager tasks (Python 3.12+) finish short coroutines without a loop hop
+        if hasattr(asyncio, "eager_task_factory"):
+            runner.get_loop().set_task_factory(asyncio.eager_task_factory)
+        runner.run(main())
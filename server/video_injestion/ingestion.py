@@ -1,6 +1,13 @@
 import asyncio
+import concurrent.futures
+import ctypes
 import cv2
+import functools
+import logging
+import logging.handlers
+import numpy as np
 import os
+import platform
 import time
 import tempfile
 from datetime import datetime
@@ -15,6 +22,71 @@ from config import Config
 from video_queue.queue_manager import VideoQueueManager
 # from performance_monitor import performance_monitor  # Removed
 
+# Used for capture-thread warnings, which are throttled and written from a
+# listener thread while ingestion runs (see start_ingestion)
+logger = logging.getLogger(__name__)
+
+# The queue handler and its listener thread are shared by every running
+# ingestion system in the process: the first start installs them and the
+# last stop removes them, so records are written once and never fall back
+# to a handler on the capture thread while any system is running
+_log_lock = threading.Lock()
+_log_users = 0
+_log_handler = None
+_log_listener = None
+
+# Keep OpenCV's internal thread pool from competing with the capture and
+# encoder threads (the heavy encode runs in ffmpeg), and skip OpenCL setup,
+# whose JIT warmup can stall the first camera read
+cv2.setNumThreads(1)
+cv2.ocl.setUseOpenCL(False)
+
+# Encoder-specific ffmpeg options, fastest real-time settings for each
+H264_ENCODER_ARGS = {
+    "h264_videotoolbox": ["-b:v", "4M", "-realtime", "1"],
+    "h264_nvenc": ["-preset", "p4", "-tune", "ll", "-rc", "cbr", "-b:v", "4M"],
+    "libx264": ["-preset", "ultrafast", "-tune", "zerolatency", "-crf", "28"],
+}
+
+
+@functools.lru_cache(maxsize=1)
+def detect_h264_encoder() -> str:
+    """Pick a hardware H.264 encoder if ffmpeg can actually use one
+
+    Probes by encoding a few synthetic frames, since ffmpeg builds list
+    h264_nvenc even on hosts without an NVIDIA GPU. Falls back to libx264.
+    """
+    candidates = (
+        ["h264_videotoolbox"] if platform.system() == "Darwin" else ["h264_nvenc"]
+    )
+    for encoder in candidates:
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-f",
+            "lavfi",
+            "-i",
+            "color=size=256x256:duration=0.1",
+            "-c:v",
+            encoder,
+            "-f",
+            "null",
+            "-",
+        ]
+        try:
+            # Only the exit status matters; don't buffer ffmpeg's output
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=10,
+            )
+            if result.returncode == 0:
+                return encoder
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            break
+    return "libx264"
+
 
 class VideoIngestionSystem:
     def __init__(
@@ -42,19 +114,64 @@ class VideoIngestionSystem:
         # Video capture setup
         self.cap = None
         self.is_recording = False
-        self.frame_queue = queue.Queue(maxsize=100)
+        # Whole segments ([ring slot], started_at); owned by the
+        # event loop, fed from the capture thread through call_soon_threadsafe
+        self.segment_queue = asyncio.Queue(maxsize=4)
+        self._loop = None
+        # Resolution the camera actually negotiated (set by initialize_camera)
+        self.actual_resolution = self.resolution
+        # Size segments are encoded at (camera frames capped by INGEST_RESOLUTION)
+        self.encode_resolution = self.resolution
+
+        # Preallocated frame ring shared by capture and encoder; allocated
+        # once the camera's real frame shape is known
+        self.frame_ring = None
+        self._camera_frame_interval = 1.0 / 30
+        self._free_slots = queue.SimpleQueue()
 
         # Audio capture setup
         self.audio = None
         self.audio_stream = None
-        self.audio_queue = queue.Queue(maxsize=200)
+        # PCM byte ring written by the pyaudio callback and sliced once per
+        # segment; holds two segments so a late collector loses nothing.
+        # Offsets count total bytes and only grow (position = offset % size)
+        self._audio_frame_bytes = (
+            pyaudio.get_sample_size(self.audio_format) * audio_channels
+        )
+        self._audio_ring = bytearray(
+            2 * self.segment_duration * audio_sample_rate * self._audio_frame_bytes
+        )
+        self._audio_written = 0
+        self._audio_read = 0
 
         # Queue manager for Redis
         self.queue_manager = VideoQueueManager()
+        # Finished segments waiting to be pushed to Redis (created per run)
+        self._enqueue_queue = None
+
+        # Segments encode on their own pool so segment N encodes while N+1
+        # is collected; OpenCV and ffmpeg release the GIL while they work
+        self.encoder_pool = None
+        self.encoder_workers = 2
+        self._pending_encodes = set()
 
         # For Mac FaceTime HD camera
         self.camera_index = int(Config.CAMERA_INDEX) if Config.CAMERA_INDEX else 0
 
+        # Segment files go under one known directory, in a unique directory
+        # per run (several users' systems can run in one process)
+        self.output_dir = os.path.join(tempfile.gettempdir(), "ingestion")
+        self._run_dir = None
+
+        # H.264 encoder for the ffmpeg pass, detected on start
+        self.video_encoder = "libx264"
+
+        # Throttle state for capture-thread warnings, and the listener that
+        # writes them off the capture thread
+        self._last_warning = 0.0
+        self._suppressed_warnings = 0
+        self._uses_log_listener = False
+
         # Thread management
         self.capture_thread = None
         self.audio_thread = None
@@ -75,30 +192,47 @@ class VideoIngestionSystem:
             if not self.cap.isOpened():
                 raise Exception(f"Failed to open camera at index {self.camera_index}")
 
+            # Ask for MJPEG before sizing: uncompressed YUYV saturates USB 2.0
+            # at 720p+, and grabbed-but-skipped MJPEG frames are never decoded.
+            # Backends that don't support it (AVFoundation) keep their default
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+
             # Set camera properties
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
             self.cap.set(cv2.CAP_PROP_FPS, 30)  # Keep camera at 30fps, we'll subsample
-
-            # Give camera time to initialize
-            time.sleep(1)
-
-            # Test frame capture with retries
-            for attempt in range(5):
-                ret, frame = self.cap.read()
+            # Keep only the newest frame in the driver so reads aren't stale;
+            # backends that ignore this (AVFoundation) are drained in capture
+            try:
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            except Exception:
+                pass
+
+            # Poll until the camera delivers a frame (about 2s at most)
+            # instead of a fixed warm-up sleep; grab() is cheap, so only
+            # decode once a frame is actually there
+            for _ in range(100):
+                ret, frame = self.cap.retrieve() if self.cap.grab() else (False, None)
                 if ret and frame is not None:
                     actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                     actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                     actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
+                    fourcc = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+                    codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4))
 
                     print(
-                        f"Camera initialized: {actual_width}x{actual_height} @ {actual_fps}fps"
+                        f"Camera initialized: {actual_width}x{actual_height} @ {actual_fps}fps ({codec.strip(chr(0)) or 'unknown'})"
                     )
                     print(f"Camera index: {self.camera_index}")
+                    self._camera_frame_interval = 1.0 / (actual_fps or 30)
+                    # Size the writer from the real frames; cameras may ignore
+                    # the requested resolution
+                    self.actual_resolution = (frame.shape[1], frame.shape[0])
+                    self.encode_resolution = self._fit_encode_resolution()
+                    self._allocate_frame_ring(frame.shape)
                     return True
                 else:
-                    print(f"Frame capture attempt {attempt + 1} failed, retrying...")
-                    time.sleep(0.5)
+                    time.sleep(0.02)
 
             raise Exception("Failed to capture test frame after multiple attempts")
 
@@ -108,6 +242,43 @@ class VideoIngestionSystem:
                 self.cap.release()
             return False
 
+    def _fit_encode_resolution(self):
+        """Scale the camera size down to fit INGEST_RESOLUTION, keeping aspect"""
+        width, height = self.actual_resolution
+        max_width, max_height = Config.INGEST_RESOLUTION or self.actual_resolution
+        scale = min(max_width / width, max_height / height, 1.0)
+        if scale == 1.0:
+            return self.actual_resolution
+        # H.264 with 4:2:0 chroma needs even dimensions
+        return (int(width * scale) // 2 * 2, int(height * scale) // 2 * 2)
+
+    def _allocate_frame_ring(self, frame_shape):
+        """Allocate room for one segment per encoder plus the one being collected"""
+        slots = self.fps * self.segment_duration * (self.encoder_workers + 1)
+        self.frame_ring = np.empty((slots, *frame_shape), dtype=np.uint8)
+        self._free_slots = queue.SimpleQueue()
+        for idx in range(slots):
+            self._free_slots.put(idx)
+
+    def _drain_stale_frames(self, max_frames=4):
+        """Grab past frames queued in the driver; returns whether a frame is held.
+
+        A grab that returns faster than the camera cadence came from the
+        driver's backlog, so keep grabbing until one waits on the sensor.
+        """
+        for _ in range(max_frames):
+            start = time.monotonic()
+            if not self.cap.grab():
+                return False
+            if time.monotonic() - start > self._camera_frame_interval / 2:
+                break
+        return True
+
+    def _release_slots(self, frames_data):
+        """Return the ring slots used by a segment to the free pool"""
+        for idx in set(frames_data):
+            self._free_slots.put(idx)
+
     def initialize_audio(self):
         """Initialize audio capture"""
         try:
@@ -143,72 +314,355 @@ class VideoIngestionSystem:
     def _audio_callback(self, in_data, frame_count, time_info, status):
         """Audio stream callback"""
         if self.is_recording and not self._shutdown_event.is_set():
-            timestamp = time.time()
-            try:
-                self.audio_queue.put_nowait((in_data, timestamp))
-            except queue.Full:
-                # Drop oldest audio chunk if queue is full
-                try:
-                    self.audio_queue.get_nowait()
-                    self.audio_queue.put_nowait((in_data, timestamp))
-                except queue.Empty:
-                    pass
+            ring = memoryview(self._audio_ring)
+            data = memoryview(in_data)
+            pos = self._audio_written % len(ring)
+            first = min(len(data), len(ring) - pos)
+            ring[pos : pos + first] = data[:first]
+            ring[: len(data) - first] = data[first:]  # Wrap around
+            # Publish only after the bytes are in place
+            self._audio_written += len(data)
         return (in_data, pyaudio.paContinue)
 
     def capture_frames(self):
-        """Continuously capture frames and put them in queue with proper rate limiting"""
+        """Capture frames at the target FPS and emit them as whole segments
+
+        Segment boundaries are tracked here, so the event loop only wakes
+        once per segment instead of once per frame.
+        """
+        self._raise_capture_priority()
+
         target_frame_interval = 1.0 / self.fps  # Seconds between frames for target FPS
-        last_frame_time = 0
+        # Hard cap per segment, so a late boundary can't grow the encode
+        frames_per_segment = self.fps * self.segment_duration
+        # Frame n is due at t0 + n / fps on the monotonic clock
+        t0 = last_read = time.monotonic()
+        frame_index = 0
+
+        # Ring slots in capture order; frames are evenly paced, so the
+        # segment's start time stands in for per-frame timestamps
+        segment_frames = []
+        segment_end = t0 + self.segment_duration
+        started_at = time.time()
 
         while self.is_recording and not self._shutdown_event.is_set():
+            idx = None
             try:
-                ret, frame = self.cap.read()
-                current_time = time.time()
-
-                if ret:
-                    # Only capture frames at our target FPS rate
-                    if current_time - last_frame_time >= target_frame_interval:
-                        # Add frame to queue (non-blocking)
-                        try:
-                            self.frame_queue.put_nowait((frame, current_time))
-                            last_frame_time = current_time
-                        except queue.Full:
-                            # Drop oldest frame if queue is full
-                            try:
-                                self.frame_queue.get_nowait()
-                                self.frame_queue.put_nowait((frame, current_time))
-                                last_frame_time = current_time
-                            except queue.Empty:
-                                pass
+                # Always grab to keep up with the camera; decoding is deferred
+                if time.monotonic() - last_read > 2 * self._camera_frame_interval:
+                    # Fell behind the camera; skip frames buffered meanwhile
+                    grabbed = self._drain_stale_frames()
                 else:
-                    print("Failed to capture frame", file=sys.stderr)
+                    grabbed = self.cap.grab()
+                last_read = current_time = time.monotonic()
+
+                if current_time >= segment_end:
+                    # Segment boundary: hand the finished segment to the loop
+                    self._emit_segment(segment_frames, started_at)
+                    segment_frames = []
+                    started_at = time.time()
+                    segment_end += self.segment_duration
+                    if segment_end <= current_time:
+                        segment_end = current_time + self.segment_duration
+
+                if not grabbed:
+                    self._warn_throttled("Failed to capture frame")
                     time.sleep(0.1)
+                    continue
+
+                # Only retrieve frames we keep: those due by the cadence
+                deadline = t0 + frame_index * target_frame_interval
+                if current_time < deadline:
+                    continue
+                if current_time > deadline + target_frame_interval:
+                    # Missed whole deadlines (stall); resync instead of bursting
+                    frame_index = int((current_time - t0) * self.fps)
+                frame_index += 1
+                if len(segment_frames) >= frames_per_segment:
+                    continue
+
+                try:
+                    idx = self._free_slots.get_nowait()
+                except queue.Empty:
+                    # Encoders still hold every slot; drop this frame
+                    self._warn_throttled("Frame ring full, dropping frame")
+                    continue
+
+                # Decode straight into the ring slot (no per-frame allocation)
+                slot = self.frame_ring[idx]
+                ret, frame = self.cap.retrieve(slot)
+                if ret:
+                    if frame is not slot:
+                        slot[...] = frame  # Backend ignored the dst buffer
+                    segment_frames.append(idx)
+                    idx = None
 
             except Exception as e:
-                print(f"Error in frame capture: {e}", file=sys.stderr)
+                self._warn_throttled(f"Error in frame capture: {e}")
                 time.sleep(0.1)
+            finally:
+                # Slot wasn't added to the segment; return it to the pool
+                if idx is not None:
+                    self._free_slots.put(idx)
 
+        # Flush the partial segment so stopping doesn't lose the last seconds
+        self._emit_segment(segment_frames, started_at)
         print("Frame capture thread stopped")
 
-    def create_video_segment(self, frames_data, audio_data, segment_id):
-        """Create a video segment file with audio and return metadata"""
+    def _warn_throttled(self, message):
+        """Log a capture-thread warning at most once a second"""
+        now = time.monotonic()
+        if now - self._last_warning < 1.0:
+            self._suppressed_warnings += 1
+            return
+        if self._suppressed_warnings:
+            message += f" ({self._suppressed_warnings} similar suppressed)"
+        logger.warning(message)
+        self._last_warning = now
+        self._suppressed_warnings = 0
+
+    def _start_log_listener(self):
+        """Write this module's log records from a background thread"""
+        global _log_users, _log_handler, _log_listener
+        with _log_lock:
+            if self._uses_log_listener:
+                return
+            self._uses_log_listener = True
+            _log_users += 1
+            if _log_users > 1:
+                return
+            log_queue = queue.SimpleQueue()
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _log_listener = logging.handlers.QueueListener(log_queue, handler)
+            _log_handler = logging.handlers.QueueHandler(log_queue)
+            logger.addHandler(_log_handler)
+            logger.propagate = False
+            _log_listener.start()
+
+    def _stop_log_listener(self):
+        """Release the shared listener; the last user flushes and removes it"""
+        global _log_users, _log_handler, _log_listener
+        with _log_lock:
+            if not self._uses_log_listener:
+                return
+            self._uses_log_listener = False
+            _log_users -= 1
+            if _log_users:
+                return
+            logger.removeHandler(_log_handler)
+            logger.propagate = True
+            _log_listener.stop()
+            _log_handler = _log_listener = None
+
+    @staticmethod
+    def _raise_capture_priority():
+        """Best-effort scheduling boost for the calling (capture) thread"""
+        try:
+            if platform.system() == "Darwin":
+                # QOS_CLASS_USER_INTERACTIVE keeps the thread on performance cores
+                libc = ctypes.CDLL("libc.dylib")
+                libc.pthread_set_qos_class_self_np(0x21, 0)
+            elif hasattr(os, "nice"):
+                # Per-thread on Linux; needs CAP_SYS_NICE, so failure is fine
+                os.nice(-5)
+        except Exception:
+            pass
+
+    def _emit_segment(self, frames_data, started_at):
+        """Hand a finished segment from the capture thread to the event loop"""
         if not frames_data:
-            return None
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._put_segment, frames_data, started_at)
+        except RuntimeError:
+            # Event loop already closed; nothing will encode these frames
+            self._release_slots(frames_data)
+
+    def _put_segment(self, frames_data, started_at):
+        """Queue a captured segment; runs on the event loop via call_soon_threadsafe"""
+        try:
+            self.segment_queue.put_nowait((frames_data, started_at))
+        except asyncio.QueueFull:
+            print("Segment queue full, dropping segment", file=sys.stderr)
+            self._release_slots(frames_data)
+
+    def _encode_with_ffmpeg(self, frames_data, audio_path, output_path):
+        """Encode ring frames (plus optional WAV audio) to H.264 in one ffmpeg pass
+
+        Raw frames are piped to ffmpeg's stdin from the ring, so the chosen
+        (hardware when available) encoder is the only encode. Returns True
+        on success.
+        """
+        width, height = self.actual_resolution
+        # I420 is half the bytes of BGR and what the encoders want anyway, so
+        # ffmpeg skips its own conversion; it needs even dimensions
+        send_yuv = width % 2 == 0 and height % 2 == 0
+        cmd = [
+            "ffmpeg",
+            "-y",  # -y to overwrite output file
+            "-hide_banner",
+            "-nostats",
+            "-loglevel",
+            "error",  # Keep stderr small; it is only read after the pipe closes
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "yuv420p" if send_yuv else "bgr24",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(self.fps),
+            "-i",
+            "-",  # video input from stdin
+        ]
+        if audio_path:
+            cmd += ["-i", audio_path]  # audio input
+        if self.encode_resolution != self.actual_resolution:
+            # Downscale in ffmpeg so every later stage handles fewer pixels
+            cmd += ["-vf", "scale={}:{}:flags=area".format(*self.encode_resolution)]
+        cmd += [
+            "-c:v",
+            self.video_encoder,  # hardware encoder when available
+            *H264_ENCODER_ARGS[self.video_encoder],
+            "-g",
+            str(self.fps),  # One-second GOP, no long lookahead
+            "-pix_fmt",
+            "yuv420p",
+        ]
+        if audio_path:
+            cmd += [
+                "-c:a",
+                "aac",  # audio codec
+                "-shortest",  # finish when shortest stream ends
+            ]
+        cmd += [
+            "-threads",
+            "0",  # Use all available CPU cores
+            "-movflags",
+            "+faststart",  # moov up front so the file is seekable
+            output_path,
+        ]
 
         try:
-            # Create temporary files
-            temp_video_file = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
-            temp_video_path = temp_video_file.name
-            temp_video_file.close()
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            print(f"FFmpeg error: {e}")
+            return False
 
-            temp_audio_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            temp_audio_path = temp_audio_file.name
-            temp_audio_file.close()
+        # Bound the whole encode, streamed writes included: a stalled encoder
+        # would otherwise block this pool thread and pin its ring slots
+        timed_out = threading.Event()
 
-            final_video_file = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
-            final_video_path = final_video_file.name
-            final_video_file.close()
+        def kill_stalled():
+            timed_out.set()
+            proc.kill()
 
+        watchdog = threading.Timer(self.segment_duration + 15, kill_stalled)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            try:
+                if send_yuv:
+                    yuv = np.empty((height * 3 // 2, width), dtype=np.uint8)
+                    converted_idx = None
+                    for idx in frames_data:
+                        if idx != converted_idx:  # Padding repeats the last slot
+                            cv2.cvtColor(
+                                self.frame_ring[idx], cv2.COLOR_BGR2YUV_I420, dst=yuv
+                            )
+                            converted_idx = idx
+                        proc.stdin.write(yuv)
+                else:
+                    for idx in frames_data:
+                        proc.stdin.write(self.frame_ring[idx])  # Contiguous, no copy
+            except OSError:
+                pass  # ffmpeg exited early (or was killed); its stderr says why
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+            # Not communicate(): it would flush the stdin closed above
+            stderr = proc.stderr.read()
+            proc.wait()
+        finally:
+            watchdog.cancel()
+            proc.stderr.close()
+
+        if timed_out.is_set():
+            print("FFmpeg error: timed out")
+            return False
+
+        if proc.returncode != 0:
+            print(f"FFmpeg failed: {stderr.decode(errors='replace')}")
+            return False
+        return True
+
+    def _write_with_opencv(self, frames_data, output_path):
+        """Last-resort OpenCV writer for hosts where ffmpeg is unusable
+
+        Prefers H.264 ("avc1") so the file matches the ffmpeg path; OpenCV
+        builds without an H.264 encoder fall back to mp4v.
+        """
+        for fourcc in ("avc1", "mp4v"):
+            writer = cv2.VideoWriter(
+                output_path,
+                cv2.VideoWriter_fourcc(*fourcc),
+                self.fps,
+                self.actual_resolution,
+            )
+            if writer.isOpened():
+                break
+            writer.release()
+        else:
+            return False
+
+        for idx in frames_data:
+            writer.write(self.frame_ring[idx])
+        writer.release()
+        return True
+
+    def _take_audio(self):
+        """Return the PCM bytes captured since the last call"""
+        size = len(self._audio_ring)
+        written = self._audio_written
+        # If the callback lapped us, keep the newest ring's worth
+        start = max(self._audio_read, written - size)
+        self._audio_read = written
+
+        begin, end = start % size, written % size
+        if written - start == 0:
+            return b""
+        if begin < end:
+            return bytes(self._audio_ring[begin:end])
+        return bytes(self._audio_ring[begin:]) + bytes(self._audio_ring[:end])
+
+    def create_video_segment(self, frames_data, audio_data, segment_id, started_at):
+        """Create a video segment file with audio and return metadata
+
+        frames_data lists the segment's ring slots in order and audio_data
+        is its raw PCM bytes. started_at is the segment's wall-clock start
+        (epoch seconds), stamped once by the capture thread rather than per
+        encode.
+        """
+        if not frames_data:
+            return None
+
+        # Slots are referenced by index; hold them until the encode is done
+        used_slots = list(frames_data)
+
+        # Named paths in the run's own dir; ffmpeg and wave create them
+        base_path = os.path.join(self._run_dir, f"segment_{segment_id:06d}")
+        temp_audio_path = base_path + ".wav"
+        final_video_path = base_path + ".mp4"
+
+        try:
             # Validate and pad frames to ensure proper duration
             expected_frames = self.fps * self.segment_duration
             min_frames_for_4s = int(4 * self.fps)  # TwelveLabs minimum
@@ -220,44 +674,15 @@ class VideoIngestionSystem:
             # Pad frames if we don't have enough for the target duration
             if len(frames_data) < expected_frames and frames_data:
                 print(f"Padding frames: {len(frames_data)} -> {expected_frames}")
-                last_frame, base_timestamp = frames_data[-1]
-                original_count = len(frames_data)
-
-                # Pad to reach expected duration
-                for i in range(original_count, expected_frames):
-                    timestamp = base_timestamp + (i - original_count + 1) / self.fps
-                    frames_data.append((last_frame.copy(), timestamp))
+                # Pad to reach expected duration by repeating the last slot
+                frames_data.extend(
+                    [frames_data[-1]] * (expected_frames - len(frames_data))
+                )
 
                 print(
                     f"Padded to {len(frames_data)} frames for {len(frames_data) / self.fps:.1f}s duration"
                 )
 
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            writer = cv2.VideoWriter(temp_video_path, fourcc, self.fps, self.resolution)
-
-            if not writer.isOpened():
-                raise Exception(f"Failed to open video writer for {temp_video_path}")
-
-            frames_written = 0
-            for frame, timestamp in frames_data:
-                if frame is not None and frame.size > 0:
-                    writer.write(frame)
-                    frames_written += 1
-                else:
-                    print(f"Warning: Skipping invalid frame at index {frames_written}")
-
-            writer.release()
-            print(f"Video writer: wrote {frames_written} frames to {temp_video_path}")
-
-            # Verify the created video file
-            if os.path.exists(temp_video_path):
-                file_size = os.path.getsize(temp_video_path)
-                print(f"Created video file: {file_size} bytes")
-                if file_size < 1000:  # Less than 1KB is suspicious
-                    print(f"Warning: Video file is very small ({file_size} bytes)")
-            else:
-                raise Exception(f"Video file was not created: {temp_video_path}")
-
             # Create audio file if we have audio data
             if audio_data:
                 with wave.open(temp_audio_path, "wb") as wav_file:
@@ -265,82 +690,59 @@ class VideoIngestionSystem:
                     wav_file.setsampwidth(self.audio.get_sample_size(self.audio_format))
                     wav_file.setframerate(self.audio_sample_rate)
 
-                    # Combine all audio chunks
-                    audio_bytes = b"".join([chunk for chunk, timestamp in audio_data])
-                    wav_file.writeframes(audio_bytes)
+                    wav_file.writeframes(audio_data)
 
-                # Use FFmpeg to combine video and audio with optimized settings
-                try:
-                    cmd = [
-                        "ffmpeg",
-                        "-y",  # -y to overwrite output file
-                        "-i",
-                        temp_video_path,  # video input
-                        "-i",
-                        temp_audio_path,  # audio input
-                        "-c:v",
-                        "libx264",  # video codec
-                        "-preset",
-                        "ultrafast",  # Fastest encoding preset
-                        "-crf",
-                        "28",  # Slightly lower quality for speed
-                        "-c:a",
-                        "aac",  # audio codec
-                        "-shortest",  # finish when shortest stream ends
-                        "-threads",
-                        "0",  # Use all available CPU cores
-                        final_video_path,
-                    ]
-
-                    result = subprocess.run(
-                        cmd, capture_output=True, text=True, timeout=15
-                    )  # Reduced timeout
-
-                    if result.returncode == 0:
-                        # Clean up temporary files
-                        os.unlink(temp_video_path)
-                        os.unlink(temp_audio_path)
-                        final_path = final_video_path
-                    else:
-                        print(f"FFmpeg failed: {result.stderr}")
-                        # Fall back to video-only
-                        os.unlink(temp_audio_path)
-                        os.unlink(final_video_path)
-                        final_path = temp_video_path
-
-                except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-                    print(f"FFmpeg error: {e}, falling back to video-only")
-                    # Clean up and fall back to video-only
-                    os.unlink(temp_audio_path)
-                    os.unlink(final_video_path)
-                    final_path = temp_video_path
-            else:
-                # No audio data, use video-only file
+            # Single encode with audio; fall back to video-only, then to
+            # OpenCV's writer if ffmpeg can't be used at all
+            encoded = has_audio = bool(audio_data) and self._encode_with_ffmpeg(
+                frames_data, temp_audio_path, final_video_path
+            )
+            if not has_audio:
+                if audio_data:
+                    print("Falling back to video-only")
+                encoded = self._encode_with_ffmpeg(frames_data, None, final_video_path)
+                if not (
+                    encoded or self._write_with_opencv(frames_data, final_video_path)
+                ):
+                    raise Exception(f"Failed to encode video for {final_video_path}")
+
+            self._release_slots(used_slots)
+            used_slots = []
+            if audio_data:
                 os.unlink(temp_audio_path)
-                os.unlink(final_video_path)
-                final_path = temp_video_path
+            final_path = final_video_path
+
+            # Verify the created video file
+            file_size = os.path.getsize(final_path)
+            print(f"Created video file: {file_size} bytes")
+            if file_size < 1000:  # Less than 1KB is suspicious
+                print(f"Warning: Video file is very small ({file_size} bytes)")
 
             # Calculate actual video duration
             actual_duration = len(frames_data) / self.fps
+            audio_chunks = len(audio_data) // (
+                self.audio_chunk_size * self._audio_frame_bytes
+            )
 
             # Return metadata with file path
             segment_info = {
                 "segment_id": segment_id,
                 "video_path": final_path,
                 "fps": self.fps,
-                "resolution": self.resolution,
+                # OpenCV fallback writes camera-size frames, unscaled
+                "resolution": self.encode_resolution
+                if encoded
+                else self.actual_resolution,
                 "frame_count": len(frames_data),
                 "duration_seconds": actual_duration,
-                "audio_chunks": len(audio_data) if audio_data else 0,
-                "has_audio": bool(audio_data),
-                "timestamp": datetime.now().isoformat(),
+                "audio_chunks": audio_chunks,
+                "has_audio": has_audio,
+                "timestamp": started_at,
                 "user_id": self.user_id,
             }
 
             audio_info = (
-                f" with {len(audio_data)} audio chunks"
-                if audio_data
-                else " (video only)"
+                f" with {audio_chunks} audio chunks" if has_audio else " (video only)"
             )
             print(
                 f"Created segment {segment_id}: {len(frames_data)} frames ({actual_duration:.1f}s duration){audio_info} at {final_path}"
@@ -349,8 +751,9 @@ class VideoIngestionSystem:
 
         except Exception as e:
             print(f"Error creating video segment: {e}", file=sys.stderr)
+            self._release_slots(used_slots)
             # Clean up any temporary files
-            for path in [temp_video_path, temp_audio_path, final_video_path]:
+            for path in [temp_audio_path, final_video_path]:
                 try:
                     if os.path.exists(path):
                         os.unlink(path)
@@ -358,104 +761,124 @@ class VideoIngestionSystem:
                     pass
             return None
 
+    async def _encode_segment(self, frames_data, audio_data, segment_id, started_at):
+        """Encode a segment on the encoder pool and hand it to the enqueue task"""
+        loop = asyncio.get_running_loop()
+        segment_info = await loop.run_in_executor(
+            self.encoder_pool,
+            self.create_video_segment,
+            frames_data,
+            audio_data,
+            segment_id,
+            started_at,
+        )
+
+        if segment_info:
+            # Hand the video file to the Redis enqueue task; the rest is metadata
+            video_path = segment_info.pop("video_path")
+            self._enqueue_queue.put_nowait((video_path, segment_info))
+
+    async def _enqueue_segments(self):
+        """Push finished segments to Redis, batching any that pile up
+
+        Each wake-up flushes whatever is already waiting (up to the batch
+        size) in one pipelined call, so a single segment goes out at once
+        while a backlog costs one round trip per batch. A None item flushes
+        and stops the loop.
+        """
+        batch_size = getattr(Config, "SEGMENT_ENQUEUE_BATCH_SIZE", 8)
+        done = False
+
+        while not done:
+            batch = [await self._enqueue_queue.get()]
+            while len(batch) < batch_size and not self._enqueue_queue.empty():
+                batch.append(self._enqueue_queue.get_nowait())
+
+            if None in batch:
+                done = True
+                batch = [item for item in batch if item is not None]
+            if not batch:
+                continue
+
+            added = await self.queue_manager.add_batch_segments(batch)
+            if added:
+                for _, segment_info in batch:
+                    audio_status = (
+                        "with audio" if segment_info.get("has_audio") else "video only"
+                    )
+                    print(
+                        f"Added segment {segment_info['segment_id']} ({audio_status}) to processing queue"
+                    )
+
     async def process_segments(self):
         """Async function to process video segments with audio and add to queue"""
-        segment_id = 0
-
         # Connect to queue manager
         await self.queue_manager.connect()
 
+        self._enqueue_queue = asyncio.Queue()
+        enqueue_task = asyncio.create_task(self._enqueue_segments())
+        self.encoder_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.encoder_workers, thread_name_prefix="segment-encoder"
+        )
+        try:
+            await self._collect_segments()
+        finally:
+            # Let in-flight encodes finish so their segments still get queued
+            if self._pending_encodes:
+                await asyncio.gather(*self._pending_encodes, return_exceptions=True)
+            self.encoder_pool.shutdown()
+            # Flush anything still pending before the queue manager disconnects
+            self._enqueue_queue.put_nowait(None)
+            await enqueue_task
+
+    async def _collect_segments(self):
+        """Receive segments from the capture thread, add audio and encode them"""
+        segment_id = 0
+
         while self.is_recording and not self._shutdown_event.is_set():
             try:
-                # Collect frames and audio for segment_duration seconds
-                frames_for_segment = []
-                audio_for_segment = []
-                start_time = time.time()
-
-                # Ensure precise timing for 10-second segments
-                target_frames = self.fps * self.segment_duration
-                end_time = start_time + self.segment_duration
-                timing_precision = 0.01  # 10ms precision for segment boundaries
-
-                print(
-                    f"Collecting segment {segment_id}: targeting {target_frames} frames for {self.segment_duration}s"
-                )
-
-                # Strict timing control - exit collection exactly at end_time
-                while (
-                    time.time() < (end_time - timing_precision)
-                    and self.is_recording
-                    and not self._shutdown_event.is_set()
-                ):
-                    frames_collected = 0
-                    audio_collected = 0
-
-                    # Batch collect frames (up to 10 at once)
-                    for _ in range(10):
-                        try:
-                            frame, timestamp = self.frame_queue.get_nowait()
-                            frames_for_segment.append((frame, timestamp))
-                            frames_collected += 1
-                        except queue.Empty:
-                            break
-
-                    # Batch collect audio (up to 5 at once)
-                    for _ in range(5):
-                        try:
-                            audio_chunk, timestamp = self.audio_queue.get_nowait()
-                            audio_for_segment.append((audio_chunk, timestamp))
-                            audio_collected += 1
-                        except queue.Empty:
-                            break
-
-                    # Dynamic sleep based on collection efficiency
-                    if frames_collected == 0 and audio_collected == 0:
-                        await asyncio.sleep(
-                            0.01
-                        )  # Longer sleep when idle to reduce CPU usage
-                    else:
-                        await asyncio.sleep(
-                            0.002
-                        )  # Minimal sleep when actively collecting
-
-                print(
-                    f"Collected {len(frames_for_segment)} frames and {len(audio_for_segment)} audio chunks"
-                )
-
-                if frames_for_segment:
-                    # Create segment data with both video and audio (with priority ThreadPoolExecutor)
-                    loop = asyncio.get_event_loop()
-                    segment_info = await loop.run_in_executor(
-                        None,
-                        self.create_video_segment,
-                        frames_for_segment,
-                        audio_for_segment,
-                        segment_id,
+                # Wakes once per segment; the timeout keeps shutdown prompt
+                try:
+                    frames_data, started_at = await asyncio.wait_for(
+                        self.segment_queue.get(), timeout=1.0
                     )
+                except asyncio.TimeoutError:
+                    continue
 
-                    if segment_info:
-                        # Add video file to Redis queue for processing
-                        video_path = segment_info["video_path"]
-                        metadata = {
-                            k: v for k, v in segment_info.items() if k != "video_path"
-                        }
-                        await self.queue_manager.add_video_segment(video_path, metadata)
-
-                        audio_status = (
-                            "with audio"
-                            if segment_info.get("has_audio")
-                            else "video only"
-                        )
-                        print(
-                            f"Added segment {segment_id} ({audio_status}) to processing queue"
-                        )
-
-                    segment_id += 1
+                self._start_encode(frames_data, started_at, segment_id)
+                segment_id += 1
 
             except Exception as e:
                 print(f"Error processing segment: {e}", file=sys.stderr)
                 await asyncio.sleep(1)
 
+        # The capture thread flushes its partial segment on exit; by the time
+        # the join returns that handoff has already run on the loop
+        if self.capture_thread:
+            await asyncio.to_thread(self.capture_thread.join, 2.0)
+        while not self.segment_queue.empty():
+            frames_data, started_at = self.segment_queue.get_nowait()
+            self._start_encode(frames_data, started_at, segment_id)
+            segment_id += 1
+
+    def _start_encode(self, frames_data, started_at, segment_id):
+        """Attach the buffered audio to a segment and encode it in the background"""
+        # Audio arrives on pyaudio's thread; take whatever is buffered
+        audio_for_segment = self._take_audio()
+
+        audio_seconds = len(audio_for_segment) / (
+            self.audio_sample_rate * self._audio_frame_bytes
+        )
+        print(
+            f"Collected segment {segment_id}: {len(frames_data)} frames and {audio_seconds:.1f}s of audio"
+        )
+
+        task = asyncio.create_task(
+            self._encode_segment(frames_data, audio_for_segment, segment_id, started_at)
+        )
+        self._pending_encodes.add(task)
+        task.add_done_callback(self._pending_encodes.discard)
+
     def signal_handler(self, signum, frame):
         """Handle Ctrl+C signal"""
         print(f"\nReceived signal {signum}, shutting down...")
@@ -470,6 +893,9 @@ class VideoIngestionSystem:
         if not self.initialize_audio():
             print("Warning: Audio initialization failed, continuing with video only")
 
+        self.video_encoder = await asyncio.to_thread(detect_h264_encoder)
+        print(f"Using H.264 encoder: {self.video_encoder}")
+
         print("Starting video+audio ingestion with Redis queue...")
         print(f"Segment duration: {self.segment_duration}s")
         print("Direct S3 upload mode - no local storage")
@@ -480,6 +906,14 @@ class VideoIngestionSystem:
 
         self.is_recording = True
         self._shutdown_event.clear()
+        self._loop = asyncio.get_running_loop()
+        self._start_log_listener()
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Segment ids restart at 0 each run; mkdtemp keeps concurrent and
+        # successive runs apart
+        self._run_dir = tempfile.mkdtemp(
+            prefix=datetime.now().strftime("%Y%m%d_%H%M%S_"), dir=self.output_dir
+        )
 
         # Start frame capture in separate thread
         self.capture_thread = threading.Thread(target=self.capture_frames)
@@ -526,6 +960,7 @@ class VideoIngestionSystem:
             self.capture_thread.join(timeout=2.0)
             if self.capture_thread.is_alive():
                 print("Warning: Capture thread did not stop gracefully")
+        self._stop_log_listener()
 
         if self.cap:
             self.cap.release()
@@ -2,10 +2,13 @@
 S3 storage handler for video segments
 """
 
+import asyncio
 import boto3
 import os
 from pathlib import Path
 from typing import Optional, Dict
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 from config import Config
 
@@ -17,6 +20,14 @@ class S3StorageManager:
         self.bucket_name = bucket_name or Config.S3_BUCKET_NAME
         self.region = region or Config.S3_REGION
         self.s3_client = None
+        # Multipart transfer settings: parts of a segment upload concurrently.
+        # 5 MB is S3's minimum part size, so typical 5-20 MB segments split
+        # into parts instead of going up as one sequential PUT
+        self.transfer_config = TransferConfig(
+            multipart_threshold=5 * 1024 * 1024,
+            multipart_chunksize=5 * 1024 * 1024,
+            max_concurrency=8,
+        )
         self._initialize_client()
 
     def _initialize_client(self):
@@ -27,6 +38,13 @@ class S3StorageManager:
                 region_name=self.region,
                 aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
                 aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                # Each worker builds its own manager, so one upload's parts
+                # (plus a little headroom) is all the pool needs; connections
+                # are kept alive so TCP/TLS setup is reused across segments
+                config=BotoConfig(
+                    max_pool_connections=self.transfer_config.max_concurrency + 2,
+                    tcp_keepalive=True,
+                ),
             )
             print(f"S3 client initialized for bucket: {self.bucket_name}")
         except NoCredentialsError:
@@ -76,6 +94,7 @@ class S3StorageManager:
                     "ContentType": "video/mp4",
                     "ServerSideEncryption": "AES256",
                 },
+                Config=self.transfer_config,
             )
 
             # Generate public URL
@@ -97,6 +116,26 @@ class S3StorageManager:
             print(f"❌ Unexpected error during S3 upload: {e}")
             return None
 
+    async def upload_video_segment_async(
+        self, local_file_path: str, s3_key: str = None
+    ) -> Optional[str]:
+        """
+        Upload video segment to S3 without blocking the event loop
+
+        Runs the blocking multipart upload in a worker thread; the transfer
+        manager uploads the parts concurrently on its own thread pool.
+
+        Args:
+            local_file_path: Path to local video file
+            s3_key: S3 object key (if None, uses filename)
+
+        Returns:
+            S3 URL if successful, None if failed
+        """
+        return await asyncio.to_thread(
+            self.upload_video_segment, local_file_path, s3_key
+        )
+
     def create_bucket_if_not_exists(self) -> bool:
         """Create S3 bucket if it doesn't exist"""
         if not self.s3_client:
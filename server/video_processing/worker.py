@@ -3,8 +3,11 @@ Async worker for processing video segments from Redis queue
 """
 
 import asyncio
+import hashlib
 import os
+import random
 import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any, Optional
 from uuid import UUID
@@ -36,6 +39,14 @@ class VideoProcessingWorker:
         self.is_running = False
         self.processed_count = 0
 
+        # Content-hash caches, only populated when ANALYSIS_CACHE_ENABLED is set
+        self.analysis_cache_enabled = getattr(Config, "ANALYSIS_CACHE_ENABLED", False)
+        # (LRU, bounded by ANALYSIS_CACHE_SIZE so long-running workers don't grow).
+        # Content key -> TwelveLabs video id, and video id -> summary
+        self.analysis_cache_size = getattr(Config, "ANALYSIS_CACHE_SIZE", 256)
+        self._upload_cache: OrderedDict[str, str] = OrderedDict()
+        self._summary_cache: OrderedDict[str, Any] = OrderedDict()
+
     async def start(self):
         """Start the worker"""
         print(f"Worker {self.worker_id} starting...")
@@ -151,20 +162,43 @@ class VideoProcessingWorker:
             video_path = job["video_path"]
             metadata = job.get("metadata", {})
 
-            # Check if file exists
-            if not os.path.exists(video_path):
+            # Check if file exists (stat once; size is reused below)
+            try:
+                video_stat = os.stat(video_path)
+            except FileNotFoundError:
                 return {"error": f"Video file not found: {video_path}"}
 
             # Generate linking UUID first to avoid bottleneck
             linking_uuid = self.supabase_manager.generate_linking_uuid()
             print(f"Worker {self.worker_id} generated linking UUID: {linking_uuid}")
 
-            # Run TwelveLabs upload, S3 upload, and preprocessing in parallel
+            # Skip the TwelveLabs upload for content we've already indexed
+            content_key = None
+            cached_video_id = None
+            if self.analysis_cache_enabled:
+                # Reads and hashes up to 4MB; keep it off the shared event loop
+                content_key = await asyncio.to_thread(
+                    self._content_key, video_path, video_stat.st_size
+                )
+                cached_video_id = self._cache_get(self._upload_cache, content_key)
+
+            if cached_video_id:
+                print(
+                    f"Worker {self.worker_id} reusing indexed video: {cached_video_id}"
+                )
+                upload_coro = asyncio.sleep(0, result=cached_video_id)
+            else:
+                upload_coro = self.upload_video(video_path, metadata)
+
+            # The S3 URL is only needed for the final record, so the upload
+            # keeps running through TwelveLabs indexing and analysis
+            s3_task = asyncio.create_task(
+                self.s3_manager.upload_video_segment_async(video_path)
+            )
+
+            # Run TwelveLabs upload and preprocessing in parallel
             upload_tasks = await asyncio.gather(
-                self.upload_video(video_path, metadata),
-                asyncio.get_event_loop().run_in_executor(
-                    None, self.s3_manager.upload_video_segment, video_path
-                ),
+                upload_coro,
                 # Pre-generate embedding task concurrently
                 self.embedding_service.create_video_embedding_task(
                     file_path=video_path
@@ -172,17 +206,17 @@ class VideoProcessingWorker:
                 return_exceptions=True,
             )
 
-            twelvelabs_video_id, s3_url, embedding_task = upload_tasks
+            twelvelabs_video_id, embedding_task = upload_tasks
 
             # Check if uploads succeeded
             if isinstance(twelvelabs_video_id, Exception) or not twelvelabs_video_id:
+                await asyncio.gather(s3_task, return_exceptions=True)
                 return {
                     "error": f"Failed to upload to TwelveLabs: {twelvelabs_video_id}"
                 }
 
-            if isinstance(s3_url, Exception) or not s3_url:
-                print(f"⚠️ S3 upload failed: {s3_url}, continuing without S3 URL")
-                s3_url = None
+            if content_key:
+                self._cache_put(self._upload_cache, content_key, twelvelabs_video_id)
 
             # Analyze video and start embedding pipeline in parallel
             # Type assertion since we've already checked it's not an exception
@@ -207,14 +241,22 @@ class VideoProcessingWorker:
             else:
                 embedding_future = None
 
-            # Wait for analysis to complete
-            analysis = await analysis_task
+            # Wait for analysis and the overlapping S3 upload to complete
+            analysis, s3_url = await asyncio.gather(
+                analysis_task, s3_task, return_exceptions=True
+            )
+            if isinstance(analysis, Exception):
+                raise analysis
+
+            if isinstance(s3_url, Exception) or not s3_url:
+                print(f"⚠️ S3 upload failed: {s3_url}, continuing without S3 URL")
+                s3_url = None
 
             # Add processing metadata
             analysis["worker_id"] = self.worker_id
             analysis["source_file"] = video_path
             analysis["s3_url"] = s3_url
-            analysis["file_size"] = os.path.getsize(video_path)
+            analysis["file_size"] = video_stat.st_size
             analysis["processed_at"] = datetime.now().isoformat()
             analysis["twelvelabs_video_id"] = twelvelabs_video_id
             analysis["linking_uuid"] = linking_uuid
@@ -301,9 +343,12 @@ class VideoProcessingWorker:
                 print(f"Worker {self.worker_id} status: {task.status}")
 
             # Use async polling to avoid blocking the entire worker
-            polling_interval = getattr(Config, "TWELVELABS_POLLING_INTERVAL", 1.0)
+            polling_interval = getattr(Config, "TWELVELABS_POLLING_INTERVAL", 0.2)
+            max_polling_interval = getattr(
+                Config, "TWELVELABS_MAX_POLLING_INTERVAL", 2.0
+            )
             video_id = await self._wait_for_task_async(
-                task, polling_interval, print_status
+                task, polling_interval, print_status, max_polling_interval
             )
 
             if video_id:
@@ -322,13 +367,23 @@ class VideoProcessingWorker:
             return None
 
     async def _wait_for_task_async(
-        self, task, sleep_interval: float, callback=None
+        self,
+        task,
+        sleep_interval: float,
+        callback=None,
+        max_sleep_interval: float = 2.0,
     ) -> Optional[str]:
-        """Async version of task.wait_for_done to prevent blocking"""
+        """Async version of task.wait_for_done to prevent blocking
+
+        Polls with exponential backoff (x1.5 per poll, capped at
+        max_sleep_interval) plus a little jitter, so short tasks are detected
+        quickly and long ones don't hammer the API.
+        """
         max_wait_time = 180  # 3 minutes max wait
-        start_time = time.time()
+        start_time = time.monotonic()
+        delay = sleep_interval
 
-        while time.time() - start_time < max_wait_time:
+        while time.monotonic() - start_time < max_wait_time:
             try:
                 # Get fresh task status from API
                 current_task = self.client.task.retrieve(task.id)
@@ -342,12 +397,12 @@ class VideoProcessingWorker:
                     print(f"Worker {self.worker_id} task failed: {current_task.status}")
                     return None
 
-                # Use asyncio.sleep instead of time.sleep to yield control
-                await asyncio.sleep(sleep_interval)
-
             except Exception as e:
                 print(f"Worker {self.worker_id} error checking task status: {e}")
-                await asyncio.sleep(sleep_interval)
+
+            # Use asyncio.sleep instead of time.sleep to yield control
+            await asyncio.sleep(delay + random.uniform(0, delay * 0.1))
+            delay = min(delay * 1.5, max_sleep_interval)
 
         print(f"Worker {self.worker_id} task timed out after {max_wait_time}s")
         return None
@@ -357,18 +412,23 @@ class VideoProcessingWorker:
     ) -> Dict:
         """Analyze video using TwelveLabs Pegasus"""
         try:
-            # Generate detailed summary
-            generation_result = self.client.generate.text(
-                video_id=video_id,
-                prompt="Provide a detailed summary of what's happening in this video segment, including any people, objects, actions, and conversations.",
-            )
+            summary = self._cache_get(self._summary_cache, video_id)
+            if summary is None:
+                # Generate detailed summary
+                generation_result = self.client.generate.text(
+                    video_id=video_id,
+                    prompt="Provide a detailed summary of what's happening in this video segment, including any people, objects, actions, and conversations.",
+                )
+                summary = generation_result.data
+                if self.analysis_cache_enabled:
+                    self._cache_put(self._summary_cache, video_id, summary)
 
             # Return simplified format with linking UUID
             analysis_results = {
                 "video_id": linking_uuid,  # Use linking UUID for consistency
                 "timestamp": timestamp,
                 "datetime": datetime.fromtimestamp(timestamp).isoformat(),
-                "detailed_summary": generation_result.data,
+                "detailed_summary": summary,
             }
 
             return analysis_results
@@ -382,6 +442,28 @@ class VideoProcessingWorker:
                 "detailed_summary": f"Error: {str(e)}",
             }
 
+    @staticmethod
+    def _cache_get(cache: OrderedDict, key: str) -> Optional[Any]:
+        """Look up an LRU cache entry, marking it most recently used"""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, cache: OrderedDict, key: str, value: Any):
+        """Store an LRU cache entry, evicting the least recently used"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.analysis_cache_size:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def _content_key(video_path: str, file_size: int) -> str:
+        """Cache key from the first 4MB of the file plus its size"""
+        with open(video_path, "rb") as f:
+            head = f.read(4 * 1024 * 1024)
+        return hashlib.sha1(head + str(file_size).encode()).hexdigest()
+
     async def embed_and_store_video(
         self, video_path: str, linking_uuid: str, timestamp: float
     ) -> bool:
@@ -4,11 +4,18 @@ Redis queue manager for video processing pipeline
 
 import json
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import redis.asyncio as redis
 from config import Config
 
 
+# Returns [queue length, server seconds, server microseconds] atomically
+QUEUE_SNAPSHOT_SCRIPT = """
+local t = redis.call('TIME')
+return {redis.call('LLEN', KEYS[1]), t[1], t[2]}
+"""
+
+
 class VideoQueueManager:
     """Manages Redis queues for video processing pipeline"""
 
@@ -19,6 +26,7 @@ class VideoQueueManager:
         )
         self.redis = None
         self.queue_name = Config.REDIS_QUEUE_NAME
+        self._snapshot_script = None
 
     async def connect(self):
         """Connect to Redis"""
@@ -35,6 +43,8 @@ class VideoQueueManager:
         """Disconnect from Redis"""
         if self.redis:
             await self.redis.aclose()
+            self.redis = None
+            self._snapshot_script = None
 
     async def add_video_segment(
         self, video_path: str, metadata: Dict[str, Any] = {}
@@ -112,6 +122,37 @@ class VideoQueueManager:
             print(f"Error getting queue size: {e}")
             return 0
 
+    async def get_queue_snapshot(self) -> Tuple[int, float]:
+        """Get queue size and Redis server time in a single round trip"""
+        try:
+            if not self.redis:
+                await self.connect()
+            if self._snapshot_script is None:
+                self._snapshot_script = self.redis.register_script(
+                    QUEUE_SNAPSHOT_SCRIPT
+                )
+            size, seconds, micros = await self._snapshot_script(keys=[self.queue_name])
+            return int(size), int(seconds) + int(micros) / 1_000_000
+        except Exception as e:
+            print(f"Error getting queue snapshot: {e}")
+            return 0, time.time()
+
+    async def subscribe_queue_events(self):
+        """Subscribe to keyspace notifications for the queue key
+
+        Requires notify-keyspace-events to include list events (e.g. "Kl")
+        on the Redis server; without it the subscription simply stays quiet.
+        """
+        try:
+            if not self.redis:
+                await self.connect()
+            pubsub = self.redis.pubsub()
+            await pubsub.subscribe(f"__keyspace@{Config.REDIS_DB}__:{self.queue_name}")
+            return pubsub
+        except Exception as e:
+            print(f"Error subscribing to queue events: {e}")
+            return None
+
     async def clear_queue(self) -> bool:
         """Clear all items from the queue"""
         try:
@@ -127,7 +168,11 @@ class VideoQueueManager:
     async def add_batch_segments(
         self, video_paths: list, metadata: Dict[str, Any] = {}
     ) -> int:
-        """Add multiple video segments to queue in optimized batch"""
+        """Add multiple video segments to queue in optimized batch
+
+        Each entry is a video path, which gets the shared metadata, or a
+        (video_path, metadata) pair carrying its own.
+        """
         try:
             if not self.redis:
                 await self.connect()
@@ -135,11 +180,18 @@ class VideoQueueManager:
             current_time = time.time()
             jobs = []
 
-            for video_path in video_paths:
+            for entry in video_paths:
+                if isinstance(entry, str):
+                    video_path, item_metadata = entry, metadata
+                else:
+                    video_path, item_metadata = entry
+                item_metadata = item_metadata or {}
                 job_data = {
                     "video_path": video_path,
-                    "metadata": metadata or {},
-                    "timestamp": current_time,  # Use same timestamp for batch
+                    "metadata": item_metadata,
+                    # The worker dates the memory from this, so keep each
+                    # segment's own capture time; enqueue time is the fallback
+                    "timestamp": item_metadata.get("timestamp", current_time),
                     "status": "pending",
                 }
                 jobs.append(json.dumps(job_data))